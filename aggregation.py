@@ -5,10 +5,30 @@ This module contains functionality for computing various basic statistics.
 This file is Copyright (c) 2023 Ram Raghav Sharma, Harshith Latchupatula, Vikram Makkar and Muhammad Ibrahim.
 """
 from typing import Optional
+import numpy as np
 
 from models import League
 
 
+def _get_team_statistic(league: League, team_name: str, attr_name: str, season: Optional[str] = None) -> np.ndarray:
+    """Return an array of the given match statistic recorded by the given team in each of their matches.
+    If the season is provided, only consider matches played in the given season.
+
+    Preconditions:
+        - season is in the format '20XX-XX' between 2009-10 and 2018-19 or season is None
+        - league.team_in_league(team_name)
+        - "home_" + attr_name and "away_" + attr_name are compiled league match statistics
+    """
+    match_ids = league.get_team_match_ids(team_name, season)
+    at_home = league.get_match_statistic("home_id")[match_ids] == league.get_team(team_name).id
+
+    return np.where(
+        at_home,
+        league.get_match_statistic("home_" + attr_name)[match_ids],
+        league.get_match_statistic("away_" + attr_name)[match_ids],
+    )
+
+
 def overall_winrate(league: League, team_name: str, season: Optional[str] = None) -> float:
     """Return the overall winrate percentage of the team with team_name in the League.
     If the season is provided, only consider matches played in the given season.
@@ -18,18 +38,15 @@ def overall_winrate(league: League, team_name: str, season: Optional[str] = None
         - league.team_in_league(team_name)
         - season is None or team_name in league.get_team_names(season)
     """
-    total_matches = 0
-    total_wins = 0
+    match_ids = league.get_team_match_ids(team_name, season)
+    team_id = league.get_team(team_name).id
 
-    team = league.get_team(team_name)
-    for match in team.matches:
-        if season is not None and match.season != season:
-            continue
-        total_matches += 1
-        if match.result == team:
-            total_wins += 1
+    result = league.get_match_statistic("result")[match_ids]
+    home_wins = (result == 0) & (league.get_match_statistic("home_id")[match_ids] == team_id)
+    away_wins = (result == 1) & (league.get_match_statistic("away_id")[match_ids] == team_id)
+    total_wins = int(np.count_nonzero(home_wins | away_wins))
 
-    return (total_wins / total_matches) * 100
+    return (total_wins / len(match_ids)) * 100
 
 
 def home_vs_away(league: League, team_name: str, season: Optional[str] = None) -> list[tuple[float, float, float]]:
@@ -47,38 +64,20 @@ def home_vs_away(league: League, team_name: str, season: Optional[str] = None) -
     draw_rate = 0
 
     if team_name is not None and season is not None:
-        team = league.get_team(team_name)
-        total_matches = len([match for match in team.matches if match.season == season])
-
-        for match in team.matches:
-            if season is not None and match.season != season:
-                continue
+        match_ids = league.get_team_match_ids(team_name, season)
+        team_id = league.get_team(team_name).id
+        result = league.get_match_statistic("result")[match_ids]
 
-            if match.result is None:
-                draw_rate += 1
+        home_wins = (result == 0) & (league.get_match_statistic("home_id")[match_ids] == team_id)
+        away_wins = (result == 1) & (league.get_match_statistic("away_id")[match_ids] == team_id)
 
-            if match.home_team == team and match.result == team:
-                home_win_rate += 1
-            elif match.away_team == team and match.result == team:
-                away_win_rate += 1
-
-        home_win_rate = (home_win_rate / total_matches) * 100
-        away_win_rate = (away_win_rate / total_matches) * 100
-        draw_rate = (draw_rate / total_matches) * 100
+        home_win_rate = (int(np.count_nonzero(home_wins)) / len(match_ids)) * 100
+        away_win_rate = (int(np.count_nonzero(away_wins)) / len(match_ids)) * 100
+        draw_rate = (int(np.count_nonzero(result == 2)) / len(match_ids)) * 100
 
     elif season is None:
-        matches = league.get_team(team_name).matches
-        for match in matches:
-            if match.home_team == match.result:
-                home_win_rate += 1
-            elif match.away_team == match.result:
-                away_win_rate += 1
-            else:
-                draw_rate += 1
-
-        home_win_rate = (home_win_rate / len(matches)) * 100
-        away_win_rate = (away_win_rate / len(matches)) * 100
-        draw_rate = (draw_rate / len(matches)) * 100
+        result = league.get_match_statistic("result")[league.get_team_match_ids(team_name)]
+        home_win_rate, away_win_rate, draw_rate = (np.bincount(result, minlength=3) / len(result) * 100).tolist()
 
     return [(round(home_win_rate, 2), round(away_win_rate, 2), round(draw_rate, 2))]
 
@@ -92,17 +91,8 @@ def get_team_goals_scored(league: League, team_name: str, season: Optional[str]
         - league.team_in_league(team_name)
         - season is None or team_name in league.get_team_names(season)
     """
-    total_matches = 0
-    goals_scored = 0
-    team = league.get_team(team_name)
-
-    for match in team.matches:
-        if season is not None and match.season != season:
-            continue
-        total_matches += 1
-        goals_scored += match.details[team_name].full_time_goals
-
-    return goals_scored / total_matches
+    goals_scored = _get_team_statistic(league, team_name, "full_time_goals", season)
+    return int(goals_scored.sum()) / len(goals_scored)
 
 
 def get_team_shot_accuracy(league: League, team_name: str, season: Optional[str] = None) -> float:
@@ -114,21 +104,12 @@ def get_team_shot_accuracy(league: League, team_name: str, season: Optional[str]
         - league.team_in_league(team_name)
         - season is None or team_name in league.get_team_names(season)
     """
-    total_matches = 0
-    accuracy = 0
-    team = league.get_team(team_name)
-
-    for match in team.matches:
-        if season is not None and match.season != season:
-            continue
-        shots = match.details[team_name].shots
-        if shots == 0:
-            continue
-        total_matches += 1
-        shots_target = match.details[team_name].shots_on_target
-        accuracy += shots_target / shots
+    shots = _get_team_statistic(league, team_name, "shots", season)
+    shots_target = _get_team_statistic(league, team_name, "shots_on_target", season)
 
-    return (accuracy / total_matches) * 100
+    took_shots = shots != 0
+    accuracy = shots_target[took_shots] / shots[took_shots]
+    return float(accuracy.mean()) * 100
 
 
 def get_team_fouls(league: League, team_name: str, season: Optional[str] = None) -> float:
@@ -140,17 +121,8 @@ def get_team_fouls(league: League, team_name: str, season: Optional[str] = None)
         - league.team_in_league(team_name)
         - season is None or team_name in league.get_team_names(season)
     """
-    total_matches = 0
-    fouls = 0
-    team = league.get_team(team_name)
-
-    for match in team.matches:
-        if season is not None and match.season != season:
-            continue
-        total_matches += 1
-        fouls += match.details[team_name].fouls
-
-    return fouls / total_matches
+    fouls = _get_team_statistic(league, team_name, "fouls", season)
+    return int(fouls.sum()) / len(fouls)
 
 
 def get_team_cards(league: League, team_name: str, season: Optional[str] = None) -> float:
@@ -163,18 +135,37 @@ def get_team_cards(league: League, team_name: str, season: Optional[str] = None)
         - league.team_in_league(team_name)
         - season is None or team_name in league.get_team_names(season)
     """
-    total_matches = 0
-    cards = 0
-    team = league.get_team(team_name)
+    yellow_cards = _get_team_statistic(league, team_name, "yellow_cards", season)
+    red_cards = _get_team_statistic(league, team_name, "red_cards", season)
+
+    cards = int(yellow_cards.sum()) + 2 * int(red_cards.sum())
+    return cards / len(yellow_cards)
+
+
+def _get_season_team_averages(
+    league: League, season: str, home_values: np.ndarray, away_values: np.ndarray
+) -> np.ndarray:
+    """Return an array of the average value recorded by each team that played in the given season,
+    ordered by team id. home_values[i] and away_values[i] are the values recorded by the home and away
+    teams in the match with id i. NaN values are left out of the averages.
+
+    Preconditions:
+        - season is in the format '20XX-XX' between 2009-10 and 2018-19
+        - len(home_values) == len(away_values) == the number of matches in the league
+    """
+    in_season = league.get_season_slice(season)
+    team_ids = np.concatenate(
+        (league.get_match_statistic("home_id")[in_season], league.get_match_statistic("away_id")[in_season])
+    )
+    values = np.concatenate((home_values[in_season], away_values[in_season])).astype(np.float64)
 
-    for match in team.matches:
-        if season is not None and match.season != season:
-            continue
-        total_matches += 1
-        cards += match.details[team_name].yellow_cards
-        cards += 2 * (match.details[team_name].red_cards)
+    recorded = ~np.isnan(values)
+    num_teams = len(league.get_team_names())
+    totals = np.bincount(team_ids[recorded], weights=values[recorded], minlength=num_teams)
+    counts = np.bincount(team_ids[recorded], minlength=num_teams)
 
-    return cards / total_matches
+    played = counts > 0
+    return totals[played] / counts[played]
 
 
 def get_season_goals_scored(league: League, season: str) -> float:
@@ -183,13 +174,13 @@ def get_season_goals_scored(league: League, season: str) -> float:
     Preconditions:
         - season is in the format '20XX-XX' between 2009-10 and 2018-19
     """
-    team_names = league.get_team_names(season)
-    team_goals_scored = []
-
-    for name in team_names:
-        team_goals_scored.append(get_team_goals_scored(league, name, season))
-
-    return (sum(team_goals_scored)) / len(team_goals_scored)
+    team_goals_scored = _get_season_team_averages(
+        league,
+        season,
+        league.get_match_statistic("home_full_time_goals"),
+        league.get_match_statistic("away_full_time_goals"),
+    )
+    return float(team_goals_scored.mean())
 
 
 def get_season_shot_accuracy(league: League, season: str) -> float:
@@ -198,13 +189,19 @@ def get_season_shot_accuracy(league: League, season: str) -> float:
     Preconditions:
         - season is in the format '20XX-XX' between 2009-10 and 2018-19
     """
-    team_names = league.get_team_names(season)
-    team_accuracy = []
+    home_shots = league.get_match_statistic("home_shots").astype(np.float64)
+    away_shots = league.get_match_statistic("away_shots").astype(np.float64)
 
-    for name in team_names:
-        team_accuracy.append(get_team_shot_accuracy(league, name, season))
-
-    return (sum(team_accuracy)) / len(team_accuracy)
+    # matches where a team took no shots have no accuracy and are left out
+    home_shots[home_shots == 0] = np.nan
+    away_shots[away_shots == 0] = np.nan
+    team_accuracy = _get_season_team_averages(
+        league,
+        season,
+        league.get_match_statistic("home_shots_on_target") / home_shots,
+        league.get_match_statistic("away_shots_on_target") / away_shots,
+    )
+    return float(team_accuracy.mean()) * 100
 
 
 def get_season_fouls(league: League, season: str) -> float:
@@ -213,13 +210,10 @@ def get_season_fouls(league: League, season: str) -> float:
     Preconditions:
         - season is in the format '20XX-XX' between 2009-10 and 2018-19
     """
-    team_names = league.get_team_names(season)
-    team_fouls = []
-
-    for name in team_names:
-        team_fouls.append(get_team_fouls(league, name, season))
-
-    return (sum(team_fouls)) / len(team_fouls)
+    team_fouls = _get_season_team_averages(
+        league, season, league.get_match_statistic("home_fouls"), league.get_match_statistic("away_fouls")
+    )
+    return float(team_fouls.mean())
 
 
 def get_season_cards(league: League, season: str) -> float:
@@ -228,10 +222,11 @@ def get_season_cards(league: League, season: str) -> float:
     Preconditions:
         - season is in the format '20XX-XX' between 2009-10 and 2018-19
     """
-    team_names = league.get_team_names(season)
-    team_cards = []
-
-    for name in team_names:
-        team_cards.append(get_team_cards(league, name, season))
-
-    return sum(team_cards) / len(team_cards)
+    # yellow cards count as one point and red cards count as two points
+    home_red_cards = league.get_match_statistic("home_red_cards").astype(np.int32)
+    away_red_cards = league.get_match_statistic("away_red_cards").astype(np.int32)
+    home_cards = league.get_match_statistic("home_yellow_cards") + 2 * home_red_cards
+    away_cards = league.get_match_statistic("away_yellow_cards") + 2 * away_red_cards
+
+    team_cards = _get_season_team_averages(league, season, home_cards, away_cards)
+    return float(team_cards.mean())
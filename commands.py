@@ -6,23 +6,28 @@ to other functions / classes.
 
 This file is Copyright (c) 2023 Ram Raghav Sharma, Harshith Latchupatula, Vikram Makkar and Muhammad Ibrahim.
 """
+# the analysis modules and loader are imported inside each command so that --help does not import pandas
+# pylint: disable=import-outside-toplevel
+from functools import lru_cache
 from typing import Optional
-from rich.progress import Progress, SpinnerColumn, TextColumn
 import typer
 
 import output as io
 import validation as validate
 from constants import Constants
-from load import load_csv_files
-import aggregation
-import records
-import optimization
-import predictions
+from models import League
 
-league = load_csv_files()
 app = typer.Typer(help=Constants().retrieve("HELP_COMMAND_INTRO"))
 
 
+@lru_cache(maxsize=1)
+def _league() -> League:
+    """Loads the league the first time a command needs it and returns the same League afterwards."""
+    from load import load_league
+
+    return load_league()
+
+
 @app.command()
 def winrate(
     team: str = typer.Option(...), season: Optional[str] = typer.Option(default=None, help="ex. 2009-10")
@@ -35,14 +40,15 @@ def winrate(
         - league.team_in_league(team)
         - season is None or team in league.get_team_names(season)
     """
+    import aggregation
+
+    league = _league()
     validate.validate_team(league, team)
     if season is not None:
         validate.validate_season(season)
         validate.validate_team_in_season(league, team, season)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
-
+    with io.spinner("Compiling results..."):
         winrate_percent = round(aggregation.overall_winrate(league, team, season), 2)
 
         if season is None:
@@ -63,13 +69,14 @@ def averages(team: str = typer.Option(...), season: str = typer.Option(..., help
         - season is in the format '20XX-XX' between 2009-10 and 2018-19
         - team in league.get_team_names(season)
     """
+    import aggregation
+
+    league = _league()
     validate.validate_team(league, team)
     validate.validate_season(season)
     validate.validate_team_in_season(league, team, season)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
-
+    with io.spinner("Compiling results..."):
         updated_data = []
         average_data = [
             [
@@ -124,16 +131,17 @@ def homevsaway(
         - team is None or league.team_in_league(team)
         - (season is None or team is None) or team in league.get_team_names(season)
     """
+    import aggregation
+
     if season is not None:
         validate.validate_season(season)
+    league = _league()
     if team is not None:
         validate.validate_team(league, team)
     if team is not None and season is not None:
         validate.validate_team_in_season(league, team, season)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
-
+    with io.spinner("Compiling results..."):
         home_vs_away = aggregation.home_vs_away(league, team, season)
         if season is not None:
             title = f"Home vs Away Winrates for {team} in the {season} Premier League Season"
@@ -161,12 +169,14 @@ def highestwinrates(
         - season is in the format '20XX-XX' between 2009-10 and 2018-19 or season is None
         - topx > 0
     """
+    import records
+
     if season is not None:
         validate.validate_season(season)
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
+    league = _league()
+    with io.spinner("Compiling results..."):
         top_win_rates = records.highest_win_rate(league, season, topx)
 
         if season is None:
@@ -187,12 +197,13 @@ def higheststreaks(
     Preconditions:
         - season is in the format '20XX-XX' between 2009-10 and 2018-19
     """
+    import records
+
     validate.validate_season(season)
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
-
+    league = _league()
+    with io.spinner("Compiling results..."):
         highest_streaks = records.highest_win_streaks(league, season, topx)
     io.table(
         title=f"Top {len(highest_streaks)} Highest Win Streaks in the {season} Premier League",
@@ -215,13 +226,14 @@ def bestcomebacks(
         - season is in the format '20XX-XX' between 2009-10 and 2018-19 or season is None
         - topx > 0
     """
+    import records
+
     if season is not None:
         validate.validate_season(season)
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
-
+    league = _league()
+    with io.spinner("Compiling results..."):
         best_comebacks = records.best_comebacks(league, season, topx)
 
         if season is None:
@@ -250,13 +262,14 @@ def mostgoals(
         - season is in the format '20XX-XX' between 2009-10 and 2018-19 or season is None
         - topx > 0
     """
+    import records
+
     if season is not None:
         validate.validate_season(season)
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
-
+    league = _league()
+    with io.spinner("Compiling results..."):
         most_goals = records.most_goals_scored(league, season, topx)
         if season is None:
             title = f"Top {len(most_goals)} Most Goals Scored Games in the Premier League"
@@ -279,13 +292,14 @@ def topfairplay(
         - season is in the format '20XX-XX' between 2009-10 and 2018-19 or season is None
         - topx > 0
     """
+    import records
+
     if season is not None:
         validate.validate_season(season)
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
-
+    league = _league()
+    with io.spinner("Compiling results..."):
         most_fairplay = records.most_fairplay(league, season, topx)
 
         if season is None:
@@ -313,12 +327,13 @@ def mostimproved(
         - season is in the format '20XX-XX' between 2009-10 and 2018-19
         - 0 < topx <= 20
     """
+    import records
+
     validate.validate_season(season)
     validate.validate_topx(topx, 20)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
-
+    league = _league()
+    with io.spinner("Compiling results..."):
         most_improved = records.most_improved_teams(league, season, topx)
         title = f"Top {len(most_improved)} Most Improved Teams in the {season} Premier League Season"
 
@@ -344,12 +359,14 @@ def optimalfouls(
         - team is None or league.team_in_league(team)
         - topx > 0
     """
+    import optimization
+
+    league = _league()
     if team is not None:
         validate.validate_team(league, team)
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
+    with io.spinner("Compiling results..."):
         optimal_fouls = optimization.calculate_optimal_fouls(league, team, topx)
 
         if team is None:
@@ -377,12 +394,14 @@ def optimalyellowcards(
         - team is None or league.team_in_league(team)
         - topx > 0
     """
+    import optimization
+
+    league = _league()
     if team is not None:
         validate.validate_team(league, team)
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
+    with io.spinner("Compiling results..."):
         optimal_yellows = optimization.calculate_optimal_yellow_cards(league, team, topx)
 
         if team is None:
@@ -409,11 +428,13 @@ def optimalreferees(
         - league.team_in_league(team)
         - topx > 0
     """
+    import optimization
+
+    league = _league()
     validate.validate_team(league, team)
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
+    with io.spinner("Compiling results..."):
         optimal_referees = optimization.calculate_optimal_referees(league, team, topx)
 
         title = f"Top {len(optimal_referees)} Optimal Referees for {team} in the Premier League"
@@ -435,10 +456,12 @@ def fairestreferees(
     Preconditions
         - topx > 0
     """
+    import optimization
+
     validate.validate_topx(topx)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
+    league = _league()
+    with io.spinner("Compiling results..."):
         fairest_referees = optimization.calculate_fairest_referees(league, topx)
 
         title = f"Top {len(fairest_referees)} Fairest Referees for all Premier League Teams"
@@ -465,6 +488,9 @@ def predict(
         - home in league.get_team_names(season)
         - away in league.get_team_names(season)
     """
+    import predictions
+
+    league = _league()
     if home == away:
         io.error("Home and away teams cannot be the same.")
     validate.validate_team(league, home)
@@ -473,8 +499,7 @@ def predict(
     validate.validate_team_in_season(league, home, season)
     validate.validate_team_in_season(league, away, season)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task("Compiling results...")
+    with io.spinner("Compiling results..."):
         prediction = round(predictions.predict(home, away, season, league), 2)
 
         prefix = "[yellow]Prediction: [/yellow]"
@@ -34,6 +34,17 @@ class Constants:
             "AR",
             "Referee",
         ]
+        self._constants["STATISTIC_COLUMNS"] = [
+            column
+            for column in self._constants["USE_COLUMNS"]
+            if column not in {"HomeTeam", "AwayTeam", "FTR", "HTR", "Referee"}
+        ]
+        # statistics are read at full width because pandas silently wraps values that do not fit
+        # a narrower dtype; they are range checked and narrowed to int8 once loaded
+        self._constants["COLUMN_DTYPES"] = {column: "int64" for column in self._constants["STATISTIC_COLUMNS"]}
+        self._constants["COLUMN_DTYPES"]["HomeTeam"] = "category"
+        self._constants["COLUMN_DTYPES"]["AwayTeam"] = "category"
+        self._constants["COLUMN_DTYPES"]["Referee"] = "category"
         self._constants[
             "HELP_COMMAND_INTRO"
         ] = "Kickoff is a football data analysis app that provides records and insights to football fans everywhere!"
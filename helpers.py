@@ -11,12 +11,18 @@ from models import League
 def get_all_matches(league: League) -> list[Match]:
     """Return a list of all the matches in the entire League class"""
     matches = []
+    seen_ids = set()
+
+    # bind the methods used in the inner loop once rather than looking them up for every match
+    add_match = matches.append
+    add_seen_id = seen_ids.add
 
     teams = league.get_team_names()
     for team in teams:
         team_matches = league.get_team(team).matches
         for match in team_matches:
-            if match not in matches:
-                matches.append(match)
+            if match.id not in seen_ids:
+                add_seen_id(match.id)
+                add_match(match)
 
     return matches
@@ -5,14 +5,71 @@ This file contains various functions that load the dataset CSV files into a grap
 This file is Copyright (c) 2023 Ram Raghav Sharma, Harshith Latchupatula, Vikram Makkar and Muhammad Ibrahim.
 """
 
+import inspect
 import os
+import pickle
+import sys
 import time
+from itertools import starmap
+from typing import Optional
+import numpy as np
 import pandas as pd
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from constants import Constants
+import models
 from models import League
-from models import Match, MatchDetails
+from models import Match, MatchDetails, Team
+
+
+def load_league() -> League:
+    """Loads the League class from the pickle file named by the KICKOFF_LEAGUE_CACHE environment variable
+    if that file is newer than all csv files in /assets. Otherwise, loads the csv files and writes the
+    League class to that pickle file so that later runs can skip parsing the datasets.
+    The pickle file is also ignored if it is older than the modules and constants that define and build the
+    League class, or if it cannot be unpickled. If the pickle file cannot be written, the loaded League is
+    still returned.
+    If the environment variable is not set, this is equivalent to load_csv_files.
+    """
+    cache_path = os.environ.get("KICKOFF_LEAGUE_CACHE")
+    if cache_path is None:
+        return load_csv_files()
+
+    sources = _get_csv_file_paths() + [__file__, models.__file__, inspect.getfile(Constants)]
+    newest_source = max(os.path.getmtime(path) for path in sources)
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) > newest_source:
+        league = _read_league_cache(cache_path)
+        if league is not None:
+            return league
+
+    league = load_csv_files()
+    _write_league_cache(league, cache_path)
+    return league
+
+
+def _read_league_cache(cache_path: str) -> Optional[League]:
+    """Returns the League class stored in the given pickle file, or None if it cannot be read."""
+    try:
+        with open(cache_path, "rb") as cache_file:
+            return pickle.load(cache_file)
+    except Exception:  # pylint: disable=broad-except
+        # the cache is disposable, so any failure to load it just means it is rebuilt
+        return None
+
+
+def _write_league_cache(league: League, cache_path: str) -> None:
+    """Writes the League class to the given pickle file. The file is written under a temporary name and then
+    moved into place, so an interrupted write never leaves a partial cache behind. Nothing is written if the
+    file cannot be created.
+    """
+    temp_path = cache_path + "." + str(os.getpid()) + ".tmp"
+    try:
+        with open(temp_path, "wb") as cache_file:
+            pickle.dump(league, cache_file)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
 
 def load_csv_files() -> League:
@@ -20,8 +77,7 @@ def load_csv_files() -> League:
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
         progress.add_task(description="Retrieving datasets...", total=None)
 
-        files = [file for file in os.listdir("./assets") if "csv" in file]
-        file_paths = ["./assets/" + file for file in files]
+        file_paths = _get_csv_file_paths()
         time.sleep(0.5)
 
         progress.add_task(description="Parsing data...", total=None)
@@ -31,14 +87,20 @@ def load_csv_files() -> League:
         progress.add_task(description="Generating graph...", total=None)
         league = League()
         for i, dataframe in enumerate(dataframes):
-            season = files[i][:7]
+            season = os.path.basename(file_paths[i])[:7]
             convert_to_graph(dataframe, league, season)
+        league.compile_match_statistics()
 
         time.sleep(0.5)
 
     return league
 
 
+def _get_csv_file_paths() -> list[str]:
+    """Returns the paths of all csv files in /assets"""
+    return ["./assets/" + file for file in os.listdir("./assets") if "csv" in file]
+
+
 def generate_pandas_dataframe(csv_file: str) -> pd.DataFrame:
     """Initializes a DataTable class with the provided csv_file name and season.
 
@@ -46,7 +108,16 @@ def generate_pandas_dataframe(csv_file: str) -> pd.DataFrame:
         - csv_file is a valid csv file stored in the assets folder
     """
     constants = Constants()
-    dataframe = pd.read_csv(csv_file, usecols=constants.retrieve("USE_COLUMNS"))
+    dataframe = pd.read_csv(
+        csv_file, usecols=constants.retrieve("USE_COLUMNS"), dtype=constants.retrieve("COLUMN_DTYPES"), engine="c"
+    )
+
+    statistic_columns = constants.retrieve("STATISTIC_COLUMNS")
+    statistics = dataframe[statistic_columns].to_numpy()
+    if statistics.min() < 0 or statistics.max() > np.iinfo(np.int8).max:
+        raise ValueError(f"{csv_file} has match statistics outside the range 0 to {np.iinfo(np.int8).max}")
+    dataframe[statistic_columns] = dataframe[statistic_columns].astype(np.int8)
+
     return dataframe
 
 
@@ -57,56 +128,62 @@ def convert_to_graph(dataframe: pd.DataFrame, league: League, season: str) -> No
         - dataframe is a valid representation of a csv file stored in the assets folder
         - season is in the format '20XX-XX' between 2009-10 and 2018-19
     """
-    for i in range(len(dataframe.index)):
-        ht_name = dataframe["HomeTeam"][i]
-        at_name = dataframe["AwayTeam"][i]
+    home_teams, away_teams = _get_match_teams(dataframe, league, season)
+    results = _get_match_winners(dataframe, home_teams, away_teams)
+    home_teams = home_teams.tolist()
+    away_teams = away_teams.tolist()
+
+    # matches with the same referee share a single interned name, and a missing referee
+    # (category code -1) is stored as NaN like pandas reads it without the category dtype
+    referee_names = [sys.intern(str(name)) for name in dataframe["Referee"].cat.categories]
+    referees = [referee_names[code] if code >= 0 else np.nan for code in dataframe["Referee"].cat.codes.tolist()]
+
+    # the columns holding each team's MatchDetails statistics, in field order, each read once as a list
+    home_columns = [dataframe[column].tolist() for column in ("HF", "HS", "HST", "HR", "HY", "HTHG", "FTHG")]
+    away_columns = [dataframe[column].tolist() for column in ("AF", "AS", "AST", "AR", "AY", "HTAG", "FTAG")]
+    home_details = list(starmap(MatchDetails, zip(home_teams, *home_columns, referees)))
+    away_details = list(starmap(MatchDetails, zip(away_teams, *away_columns, referees)))
+
+    matches = [
+        Match(season=season, home_team=home_team, away_team=away_team, order=order, details=details, result=result)
+        for order, home_team, away_team, details, result in zip(
+            range(1, len(dataframe.index) + 1), home_teams, away_teams, zip(home_details, away_details), results
+        )
+    ]
+    league.add_matches(matches)
 
-        if not league.team_in_league(ht_name):
-            home_team = league.add_team(ht_name)
-        else:
-            home_team = league.get_team(ht_name)
 
-        if not league.team_in_league(at_name):
-            away_team = league.add_team(at_name)
-        else:
-            away_team = league.get_team(at_name)
-
-        league.add_season_to_team(ht_name, season)
-        league.add_season_to_team(at_name, season)
-
-        home_team_details = MatchDetails(
-            team=home_team,
-            fouls=dataframe["HF"][i],
-            shots=int(dataframe["HS"][i]),
-            shots_on_target=int(dataframe["HST"][i]),
-            red_cards=int(dataframe["HR"][i]),
-            yellow_cards=int(dataframe["HY"][i]),
-            half_time_goals=int(dataframe["HTHG"][i]),
-            full_time_goals=int(dataframe["FTHG"][i]),
-            referee=dataframe["Referee"][i],
-        )
-        away_team_details = MatchDetails(
-            team=away_team,
-            fouls=dataframe["AF"][i],
-            shots=int(dataframe["AS"][i]),
-            shots_on_target=int(dataframe["AST"][i]),
-            red_cards=int(dataframe["AR"][i]),
-            yellow_cards=int(dataframe["AY"][i]),
-            half_time_goals=int(dataframe["HTAG"][i]),
-            full_time_goals=int(dataframe["FTAG"][i]),
-            referee=dataframe["Referee"][i],
-        )
+def _get_match_teams(dataframe: pd.DataFrame, league: League, season: str) -> tuple[np.ndarray, np.ndarray]:
+    """Returns object arrays of the home and away Team of each match in the dataframe, adding any new teams
+    to the league and the season to every team that played in it.
 
-        if dataframe["FTR"][i] == "H":
-            result = home_team
-        elif dataframe["FTR"][i] == "A":
-            result = away_team
+    Preconditions:
+        - dataframe is a valid representation of a csv file stored in the assets folder
+        - season is in the format '20XX-XX' between 2009-10 and 2018-19
+    """
+    # number the teams once, interleaving home and away names so that new teams
+    # are added to the league in the order they first appear
+    team_codes, team_names = pd.factorize(
+        np.column_stack((dataframe["HomeTeam"].tolist(), dataframe["AwayTeam"].tolist())).ravel()
+    )
+    teams = np.empty(len(team_names), dtype=object)
+    for code, name in enumerate(team_names):
+        name = sys.intern(str(name))
+        if not league.team_in_league(name):
+            teams[code] = league.add_team(name)
         else:
-            result = None
+            teams[code] = league.get_team(name)
+        league.add_season_to_team(name, season)
 
-        details = {ht_name: home_team_details, at_name: away_team_details}
-        match = Match(
-            season=season, home_team=home_team, away_team=away_team, order=(i + 1), details=details, result=result
-        )
+    return teams[team_codes[0::2]], teams[team_codes[1::2]]
+
+
+def _get_match_winners(dataframe: pd.DataFrame, home_teams: np.ndarray, away_teams: np.ndarray) -> list[Optional[Team]]:
+    """Returns the winning team of each match in the dataframe, or None for a draw.
 
-        league.add_match(ht_name, at_name, match)
+    Preconditions:
+        - dataframe is a valid representation of a csv file stored in the assets folder
+        - home_teams and away_teams hold the home and away Team of each match in the dataframe
+    """
+    ftr = dataframe["FTR"].to_numpy()
+    return np.select([ftr == "H", ftr == "A"], [home_teams, away_teams], default=None).tolist()
@@ -8,6 +8,19 @@ This file is Copyright (c) 2023 Ram Raghav Sharma, Harshith Latchupatula, Vikram
 from __future__ import annotations
 from typing import Optional
 from dataclasses import dataclass
+from operator import attrgetter
+import numpy as np
+
+# the integer statistics of MatchDetails, which never exceed double digits
+_MATCH_DETAILS_STATISTICS = (
+    "fouls",
+    "shots",
+    "shots_on_target",
+    "red_cards",
+    "yellow_cards",
+    "half_time_goals",
+    "full_time_goals",
+)
 
 
 class Match:
@@ -17,23 +30,29 @@ class Match:
             - home_team: The team playing at its home ground in this match.
             - away_team: The team playing away from its home ground in this match.
             - order: The order in which this game is played in the corresonding season.
-            - details: A mapping from each team name to its corresponding match details.
+            - details: The match details of the home team and the away team, in that order.
             - result: The team that won the match or None if the match was a draw
+            - id: The index of this match within the league it was added to.
+            - season_id: The id of this match's season within the league it was added to.
 
         Representation Invariants:
             - self.season in {'2009-10', '2010-11', '2011-12', '2012-13', '2013-14', '2014-15', '2015-16', '2016-17', \
             '2017-18', '2018-19'}
             - self.result in {self.home_team, self.away_team}
-            - self.home_team.name in self.details and self.away_team.name in self.details
+            - self.details[0].team == self.home_team and self.details[1].team == self.away_team
             - 1 <= self.order
     """
 
+    __slots__ = ("season", "home_team", "away_team", "order", "details", "result", "id", "season_id")
+
     season: str
     home_team: Team
     away_team: Team
     order: int
-    details: dict[str, MatchDetails]
+    details: tuple[MatchDetails, MatchDetails]
     result: Optional[Team]
+    id: int
+    season_id: int
 
     def __init__(
         self,
@@ -41,7 +60,7 @@ class Match:
         home_team: Team,
         away_team: Team,
         order: int,
-        details: dict[str, MatchDetails],
+        details: tuple[MatchDetails, MatchDetails],
         result: Optional[Team],
     ) -> None:
         self.season = season
@@ -61,11 +80,21 @@ class Match:
             return self.away_team
         return self.home_team
 
+    def details_for(self, team: Team) -> MatchDetails:
+        """Return the match details of the given team in this match.
+
+        Preconditions:
+            - team in {self.home_team, self.away_team}
+        """
+        if team is self.home_team:
+            return self.details[0]
+        return self.details[1]
+
     def __repr__(self) -> str:
         return f"Home: {self.home_team.name} vs Away: {self.away_team.name}"
 
 
-@dataclass(repr=True)
+@dataclass(repr=True, slots=True)
 class MatchDetails:
     """The details of a team's performance in a Premier League match.
 
@@ -95,13 +124,16 @@ class MatchDetails:
     referee: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Team:
     """A football team playing in a particular season of the Premier League.
 
     Instance Attributes:
         - name: The name of this team.
+        - id: The index of this team within the league, in the order teams were added.
         - matches: A chronologically ordered list of the matches played by this team in the season.
+        - matches_by_season: A mapping from each season id to the chronologically ordered matches
+          played by this team in that season.
         - seasons: The seasons this team has participated in.
 
     Representation Invariants:
@@ -111,61 +143,214 @@ class Team:
     """
 
     name: str
+    id: int
     matches: list[Match]
+    matches_by_season: dict[int, list[Match]]
     seasons: set[str]
 
 
+@dataclass(slots=True)
+class _LeagueArrays:
+    """The numpy arrays that index the matches and teams of a League by id.
+
+    Instance Attributes:
+        - match_statistics: A mapping from a statistic name to an array of its value in each match, indexed by match id.
+        - team_match_ids: The ids of the matches played by each team, indexed by team id.
+        - season_slices: The range of ids of the matches played in each season, indexed by season id.
+        - season_matrix: A boolean matrix whose entry [team id, season id] is whether that team played in that season.
+    """
+
+    match_statistics: dict[str, np.ndarray]
+    team_match_ids: list[np.ndarray]
+    season_slices: list[slice]
+    season_matrix: np.ndarray
+
+
 class League:
     """A graph-based representation of Premier League matches and teams.
 
     Instance Attributes:
         - teams: A mapping containing the teams playing in this season and the corresponding Team object.
         - matches: A chronologically ordered list of all matches played in this season.
+        - team_names: The names of all teams in the league, indexed by team id.
+        - arrays: The match statistics, team match ids, season slices and season matrix of this league.
+        - statistics_compiled: Whether the match statistics, team match ids and season slices have been
+          compiled. Once they have, no more teams or matches can be added, so they always reflect every match.
 
     Representation Invariants:
         - all({ name == self.teams[name].name for name in self.teams })
+        - all({ self._matches[i].id == i for i in range(len(self._matches)) })
+        - all({ self._season_ids[match.season] == match.season_id for match in self._matches })
+        - all({ self._matches[i].season_id <= self._matches[i + 1].season_id for i in range(len(self._matches) - 1) })
     """
 
     _teams: dict[str, Team]
+    _matches: list[Match]
+    _season_ids: dict[str, int]
+    _team_names: list[str]
+    _arrays: _LeagueArrays
+    _statistics_compiled: bool
 
     def __init__(self) -> None:
         self._teams = {}
+        self._matches = []
+        self._season_ids = {}
+        self._team_names = []
+        self._arrays = _LeagueArrays(
+            match_statistics={}, team_match_ids=[], season_slices=[], season_matrix=np.zeros((0, 0), dtype=bool)
+        )
+        self._statistics_compiled = False
 
     def add_team(self, name: str) -> Team:
         """Add a new team with the given team name to this league and return it.
 
+        Raise a ValueError if the match statistics of this league have already been compiled.
+
         Preconditions
             - name not in self._teams
         """
-        team = Team(name=name, matches=[], seasons=set())
+        if self._statistics_compiled:
+            raise ValueError("teams cannot be added after the match statistics have been compiled")
+        team = Team(name=name, id=len(self._teams), matches=[], matches_by_season={}, seasons=set())
         self._teams[name] = team
+        self._team_names.append(name)
         return team
 
     def add_season_to_team(self, team: str, season: str) -> None:
-        """Add a new season to the given team.
+        """Add a new season to the given team, assigning the season the next season id if it is new.
 
         Preconditions
             - name in self._teams
             - season is a season string in the format '20XX-XX' between 2009-10 and 2018-19
         """
+        team_id = self._teams[team].id
+        season_id = self._season_ids.setdefault(season, len(self._season_ids))
         self._teams[team].seasons.add(season)
 
-    def add_match(self, team1: str, team2: str, match: Match) -> None:
-        """Add a new match between the two given teams.
-        Add each team to the league if they have not been added already.
+        num_teams, num_seasons = self._arrays.season_matrix.shape
+        if team_id >= num_teams or season_id >= num_seasons:
+            season_matrix = np.zeros((len(self._teams), len(self._season_ids)), dtype=bool)
+            season_matrix[:num_teams, :num_seasons] = self._arrays.season_matrix
+            self._arrays.season_matrix = season_matrix
+        self._arrays.season_matrix[team_id, season_id] = True
+
+    def add_matches(self, matches: list[Match]) -> None:
+        """Add the given chronologically ordered matches of a single season, assigning them the next
+        match ids along with the id of their season. Each team's matches are collected first and added
+        to the team in one step.
+
+        Raise a ValueError if the match statistics of this league have already been compiled.
+
+        Preconditions
+            - all({ self.team_in_league(match.home_team.name) for match in matches })
+            - all({ self.team_in_league(match.away_team.name) for match in matches })
+            - all({ match.season == matches[0].season for match in matches })
+            - self._matches == [] or matches[0].season == self._matches[-1].season or matches[0].season is a new season
+        """
+        if self._statistics_compiled:
+            raise ValueError("matches cannot be added after the match statistics have been compiled")
+        if not matches:
+            return
+
+        season_id = self._season_ids.setdefault(matches[0].season, len(self._season_ids))
+        team_matches = {}
+        for match_id, match in enumerate(matches, len(self._matches)):
+            match.id = match_id
+            match.season_id = season_id
+            team_matches.setdefault(match.home_team.name, []).append(match)
+            team_matches.setdefault(match.away_team.name, []).append(match)
+        self._matches.extend(matches)
+
+        for name, season_matches in team_matches.items():
+            team = self._teams[name]
+            team.matches.extend(season_matches)
+            team.matches_by_season.setdefault(season_id, []).extend(season_matches)
+
+    def compile_match_statistics(self) -> None:
+        """Compile the per-match statistics of every match added to this league into arrays indexed by match id.
+        This is done automatically the first time a compiled statistic is retrieved. Afterwards, no more teams
+        or matches can be added to this league.
+
+        The result of each match is stored as 0 for a home win, 1 for an away win and 2 for a draw.
+        Each integer statistic of the match details is stored as int8, prefixed with "home_" or "away_".
+        """
+        home_details = [match.details[0] for match in self._matches]
+        away_details = [match.details[1] for match in self._matches]
+        statistics = self._arrays.match_statistics
+
+        statistics["home_id"] = np.array([match.home_team.id for match in self._matches], dtype=np.int32)
+        statistics["away_id"] = np.array([match.away_team.id for match in self._matches], dtype=np.int32)
+        statistics["result"] = np.array(
+            [
+                0 if match.result == match.home_team else 1 if match.result == match.away_team else 2
+                for match in self._matches
+            ],
+            dtype=np.int8,
+        )
+        statistics["goal_difference"] = np.array(
+            [home.full_time_goals - away.full_time_goals for home, away in zip(home_details, away_details)],
+            dtype=np.int32,
+        )
+        statistics["season_id"] = np.array([match.season_id for match in self._matches], dtype=np.int32)
+
+        # read every statistic of each side in one pass, then transpose so each statistic is a contiguous row
+        get_statistics = attrgetter(*_MATCH_DETAILS_STATISTICS)
+        for side, side_details in (("home", home_details), ("away", away_details)):
+            side_statistics = np.array(list(map(get_statistics, side_details)), dtype=np.int8).T.copy()
+            for attr_name, values in zip(_MATCH_DETAILS_STATISTICS, side_statistics):
+                statistics[side + "_" + attr_name] = values
+
+        self._arrays.team_match_ids = [
+            np.flatnonzero((statistics["home_id"] == team.id) | (statistics["away_id"] == team.id))
+            for team in self._teams.values()
+        ]
+
+        # the matches of each season are added together, so season ids never decrease along the match ids
+        season_ids = statistics["season_id"]
+        starts = np.searchsorted(season_ids, np.arange(len(self._season_ids)), side="left").tolist()
+        stops = np.searchsorted(season_ids, np.arange(len(self._season_ids)), side="right").tolist()
+        self._arrays.season_slices = [slice(start, stop) for start, stop in zip(starts, stops)]
+        self._statistics_compiled = True
+
+    def _ensure_statistics_compiled(self) -> None:
+        """Compile the match statistics of this league if they have not been compiled yet."""
+        if not self._statistics_compiled:
+            self.compile_match_statistics()
+
+    def get_match_statistic(self, name: str) -> np.ndarray:
+        """Retrieve the array of the given statistic for every match in the league, indexed by match id.
 
         Preconditions
-            - team1 in {match.away_team.name, match.home_team.name}
-            - team2 in {match.away_team.name, match.home_team.name}
-            - team1 != team2
+            - name in self._arrays.match_statistics
         """
-        if team1 not in self._teams:
-            self.add_team(team1)
-        if team2 not in self._teams:
-            self.add_team(team2)
+        self._ensure_statistics_compiled()
+        return self._arrays.match_statistics[name]
 
-        self._teams[team1].matches.append(match)
-        self._teams[team2].matches.append(match)
+    def get_season_slice(self, season: str) -> slice:
+        """Retrieve the slice of match ids of the matches played in the given season.
+
+        Preconditions
+            - a match from season has been added to this league
+        """
+        self._ensure_statistics_compiled()
+        return self._arrays.season_slices[self._season_ids[season]]
+
+    def get_team_match_ids(self, name: str, season: Optional[str] = None) -> np.ndarray:
+        """Retrieve the ids of the matches played by the given team in the order they were added.
+        If the season attribute is provided then only matches played in that season are included.
+
+        Preconditions
+            - name in self._teams
+            - season is None or season in self.get_team(name).seasons
+        """
+        self._ensure_statistics_compiled()
+        match_ids = self._arrays.team_match_ids[self._teams[name].id]
+        if season is None:
+            return match_ids
+
+        season_slice = self._arrays.season_slices[self._season_ids[season]]
+        start, stop = np.searchsorted(match_ids, (season_slice.start, season_slice.stop)).tolist()
+        return match_ids[start:stop]
 
     def team_in_league(self, name: str) -> bool:
         """Check if the given team exists within this league by the given name"""
@@ -179,6 +364,14 @@ class League:
         """
         return self._teams[name]
 
+    def get_season_id(self, season: str) -> int:
+        """Retrieve the id assigned to the given season when it was first added to this league.
+
+        Preconditions
+            - a team or match from season has been added to this league
+        """
+        return self._season_ids[season]
+
     def get_team_names(self, season: Optional[str] = None) -> list[str]:
         """Retreive the names of the teams in the league. If the season attribute is provided
         then this function will only return teams that have played in that season.
@@ -186,8 +379,10 @@ class League:
         Preconditions:
             - season is a season string in the format '20XX-XX' between 2009-10 and 2018-19 or season is None
         """
-        team_names = list(self._teams.keys())
         if season is None:
-            return team_names
+            return list(self._team_names)
+        if season not in self._season_ids:
+            return []
 
-        return [team_name for team_name in team_names if season in self.get_team(team_name).seasons]
+        team_ids = np.flatnonzero(self._arrays.season_matrix[:, self._season_ids[season]])
+        return [self._team_names[team_id] for team_id in team_ids.tolist()]
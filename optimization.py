@@ -5,85 +5,112 @@ This module contains functionality for computing various optimization statistics
 This file is Copyright (c) 2023 Ram Raghav Sharma, Harshith Latchupatula, Vikram Makkar and Muhammad Ibrahim.
 """
 
+from functools import lru_cache
 from typing import Optional
+import numpy as np
+
 from models import League
 from models import Match
-from helpers import get_all_matches
 from aggregation import overall_winrate
 
 
-def _compile_statistic_to_win_data(attr_name: str, matches: list[Match], team: Optional[str] = None) -> dict[int, int]:
-    """Returns a dictionary of specific statistic counts to the number of wins that they amass.
+def _compile_statistic_to_win_data(attr_name: str, matches: list[Match], team: str) -> dict[int, int]:
+    """Returns a dictionary of specific statistic counts to the number of wins that the given team amasses.
 
     Preconditions
         - team is a valid team
     """
+    winning_details = (
+        match.details_for(match.result) for match in matches if match.result is not None and match.result.name == team
+    )
+
     stat_wins = {}
-    for match in matches:
-        if match.result is not None and (match.result.name == team or team is None):
-            if team is None:
-                stat = getattr(match.details[match.result.name], attr_name)
-            else:
-                stat = getattr(match.details[team], attr_name)
-            if stat not in stat_wins:
-                stat_wins[stat] = 0
-            stat_wins[stat] += 1
+    for details in winning_details:
+        stat = getattr(details, attr_name)
+        if stat not in stat_wins:
+            stat_wins[stat] = 0
+        stat_wins[stat] += 1
 
     return stat_wins
 
 
+@lru_cache(maxsize=2)
+def _compile_range_wins(league: League, attr_name: str, width: int) -> np.ndarray:
+    """Returns a 2D array where each row holds the number of wins of the team with that id in each range
+    of the given integer statistic, as recorded by the winning team. The ranges have the given width.
+
+    Preconditions
+        - "home_" + attr_name and "away_" + attr_name are compiled league match statistics
+        - width >= 1
+    """
+    result = league.get_match_statistic("result")
+    home_win = result == 0
+    won = result != 2
+
+    winning_stat = np.where(
+        home_win, league.get_match_statistic("home_" + attr_name), league.get_match_statistic("away_" + attr_name)
+    )[won]
+    winner_id = np.where(home_win, league.get_match_statistic("home_id"), league.get_match_statistic("away_id"))[won]
+
+    num_teams = len(league.get_team_names())
+    num_ranges = int(winning_stat.max()) // width + 1
+    ranges = winning_stat.astype(np.int32) // width
+    range_wins = np.bincount(winner_id * num_ranges + ranges, minlength=num_teams * num_ranges)
+    return range_wins.reshape(num_teams, num_ranges)
+
+
 def _generate_optimal_range_data(
-    matches: list[Match], stat_wins: dict[int, int], width: int
+    total_matches: int, range_wins: np.ndarray, width: int, topx: int
 ) -> list[tuple[str, int, float]]:
-    """Returns an unsorted list of tuples of foul ranges, their corresponding number of wins
-    and the % of total wins they account for.
+    """Returns a list of the topx statistic ranges sorted by their corresponding number of wins,
+    along with the % of total matches they account for.
 
     Preconditions:
-        - 1 <= width < max(list(stat_wins.keys()))
+        - total_matches > 0
+        - width >= 1
+        - topx > 0
     """
-    max_stat = max(list(stat_wins.keys()))
-
-    range_mappings = {}
-    for i in range(0, max_stat + 1, width):
-        range_str = str(i) + " - " + str(i + (width - 1))
-        for j in range(width):
-            range_mappings[i + j] = range_str
-
-    stat_range_wins = {}
-    for stat in stat_wins:
-        range_mapping = range_mappings[stat]
-        if range_mapping not in stat_range_wins:
-            stat_range_wins[range_mapping] = 0
-        stat_range_wins[range_mapping] += stat_wins[stat]
-
-    optimal_ranges = [
-        (
-            stat_range,
-            stat_range_wins[stat_range],
-            round((stat_range_wins[stat_range] / len(matches)) * 100, 2),
-        )
-        for stat_range in stat_range_wins
-    ]
-    return optimal_ranges
+    ranges = np.nonzero(range_wins)[0]
+    optimal_ranges = ranges[np.argsort(-range_wins[ranges], kind="stable")[:topx]].tolist()
 
+    optimal_range_data = []
+    for i in optimal_ranges:
+        wins = int(range_wins[i])
+        range_str = str(i * width) + " - " + str(i * width + (width - 1))
+        optimal_range_data.append((range_str, wins, round((wins / total_matches) * 100, 2)))
+    return optimal_range_data
 
-def calculate_optimal_fouls(league: League, team: Optional[str] = None, topx: int = 4) -> list[tuple[str, int, float]]:
-    """Returns a list of the topx optimal foul ranges and the % of wins they account for.
+
+def _calculate_optimal_ranges(
+    league: League, attr_name: str, width: int, team: Optional[str] = None, topx: int = 4
+) -> list[tuple[str, int, float]]:
+    """Returns a list of the topx optimal ranges of the given statistic and the % of wins they account for.
+    If team is specified, only the given team's wins and matches are considered.
 
     Preconditions
         - team is None or league.team_in_league(team)
+        - width >= 1
         - topx > 0
     """
+    range_wins = _compile_range_wins(league, attr_name, width)
     if team is None:
-        matches = get_all_matches(league)
+        total_matches = len(league.get_match_statistic("result"))
+        team_range_wins = range_wins.sum(axis=0)
     else:
-        matches = league.get_team(team).matches
+        total_matches = len(league.get_team(team).matches)
+        team_range_wins = range_wins[league.get_team(team).id]
 
-    stat_wins = _compile_statistic_to_win_data(attr_name="fouls", matches=matches, team=team)
-    optimal_ranges = _generate_optimal_range_data(matches, stat_wins, width=4)
+    return _generate_optimal_range_data(total_matches, team_range_wins, width, topx)
 
-    sorted_optimal_ranges = sorted(optimal_ranges, key=lambda a: a[1], reverse=True)
-    return sorted_optimal_ranges[:topx]
+
+def calculate_optimal_fouls(league: League, team: Optional[str] = None, topx: int = 4) -> list[tuple[str, int, float]]:
+    """Returns a list of the topx optimal foul ranges and the % of wins they account for.
+
+    Preconditions
+        - team is None or league.team_in_league(team)
+        - topx > 0
+    """
+    return _calculate_optimal_ranges(league, attr_name="fouls", width=4, team=team, topx=topx)
 
 
 def calculate_optimal_yellow_cards(
@@ -95,26 +122,17 @@ def calculate_optimal_yellow_cards(
         - team is None or league.team_in_league(team)
         - topx > 0
     """
-    if team is None:
-        matches = get_all_matches(league)
-    else:
-        matches = league.get_team(team).matches
-
-    stat_wins = _compile_statistic_to_win_data(attr_name="yellow_cards", matches=matches, team=team)
-    optimal_ranges = _generate_optimal_range_data(matches, stat_wins, width=2)
-
-    sorted_optimal_ranges = sorted(optimal_ranges, key=lambda a: a[1], reverse=True)
-    return sorted_optimal_ranges[:topx]
+    return _calculate_optimal_ranges(league, attr_name="yellow_cards", width=2, team=team, topx=topx)
 
 
 def _generate_referee_win_stats(
     league: League, team: str, limit_games_refereed: bool = True
-) -> list[tuple[str, int, int, float]]:
-    """Returns an unsorted list of tuples of a referee, the number of wins they accounted for,
+) -> tuple[tuple[str, int, int, float], ...]:
+    """Returns an unsorted tuple of tuples of a referee, the number of wins they accounted for,
     the number of games referred and total win percentage.
 
     Preconditions
-        - team is None or league.team_in_league(team)
+        - league.team_in_league(team)
     """
     matches = league.get_team(team).matches
 
@@ -123,7 +141,7 @@ def _generate_referee_win_stats(
     for referee in stat_wins:
         games_refereed = 0
         for match in matches:
-            if match.details[match.away_team.name].referee == referee:
+            if match.details[1].referee == referee:
                 games_refereed += 1
         if not limit_games_refereed or games_refereed >= 20:
             optimal_referees.append(
@@ -135,7 +153,7 @@ def _generate_referee_win_stats(
                 )
             )
 
-    return optimal_referees
+    return tuple(optimal_referees)
 
 
 def calculate_optimal_referees(league: League, team: str, topx: int = 4) -> list[tuple[str, int, int, float]]:
@@ -150,12 +168,21 @@ def calculate_optimal_referees(league: League, team: str, topx: int = 4) -> list
     return sorted_optimal_ranges[:topx]
 
 
-def calculate_fairest_referees(league: League, topx: int = 4) -> list[tuple[str, int, int, float]]:
+def calculate_fairest_referees(league: League, topx: int = 4) -> list[tuple[str, int, str]]:
     """Returns a list of the topx fairest referees and their game win percentage.
 
     Preconditions
         - topx > 0
     """
+    return _compile_fairest_referees(league)[:topx]
+
+
+@lru_cache(maxsize=1)
+def _compile_fairest_referees(league: League) -> list[tuple[str, int, str]]:
+    """Returns a list of all referees who refereed at least 20 games, sorted from fairest to least fair,
+    along with the number of games they refereed and their average winrate discrepancy.
+    The result is cached, so callers must not modify the returned list.
+    """
     team_names = league.get_team_names()
 
     referee_discrepancies = {}
@@ -179,5 +206,4 @@ def calculate_fairest_referees(league: League, topx: int = 4) -> list[tuple[str,
 
         if games_refereed >= 20:
             fairest_referees.append((referee, games_refereed, string_avg_discrepancy))
-    sorted_fairest_referees = sorted(fairest_referees, key=lambda a: abs(float(a[2][1:])))
-    return sorted_fairest_referees[:topx]
+    return sorted(fairest_referees, key=lambda a: abs(float(a[2][1:])))
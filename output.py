@@ -5,8 +5,10 @@ This module contains helper functions to output various messages to the console
 This file is Copyright (c) 2023 Ram Raghav Sharma, Harshith Latchupatula, Vikram Makkar and Muhammad Ibrahim.
 """
 
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator
 from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 from rich.style import Style
 from rich import box
@@ -29,6 +31,14 @@ def error(message: str) -> None:
     raise typer.Exit()
 
 
+@contextmanager
+def spinner(message: str) -> Iterator[None]:
+    """Uses rich to display a transient spinner with the given message while the enclosed block runs."""
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
+        progress.add_task(message)
+        yield
+
+
 def table(title: str, headers: list[str], colors: list[str], data: list[tuple[Any]], width: int) -> None:
     """Uses rich to print a table with the specified table, headers, colors and data.
 
@@ -4,7 +4,7 @@ This module contains functionality for predicting future premier league match re
 
 This file is Copyright (c) 2023 Ram Raghav Sharma, Harshith Latchupatula, Vikram Makkar and Muhammad Ibrahim.
 """
-import numpy as np
+from typing import Iterator
 
 from models import League
 from models import Match
@@ -28,70 +28,63 @@ def predict(home: str, away: str, season: str, league: League) -> float:
     PREDICTION_DEPTH = 4
     home_team = league.get_team(home)
     away_team = league.get_team(away)
-    paths = _find_all_paths(home_team, away_team, season, PREDICTION_DEPTH)
-
-    goal_diffs = []
-    weights = []
-
-    for path in paths:
-        weights.append(1 / len(path))
-        total_diff = 0
-        for i, match in enumerate(path):
-            if i % 2 == 0:
-                left_team_goals = match.details[match.home_team.name].full_time_goals
-                right_team_goals = match.details[match.away_team.name].full_time_goals
-            else:
-                left_team_goals = match.details[match.away_team.name].full_time_goals
-                right_team_goals = match.details[match.home_team.name].full_time_goals
+    season_id = league.get_season_id(season)
+    goal_differences = league.get_match_statistic("goal_difference").tolist()
 
-            goal_diff = left_team_goals - right_team_goals
-            total_diff += goal_diff
-        goal_diffs.append(total_diff)
+    return _weighted_average_goal_diff(home_team, away_team, season_id, PREDICTION_DEPTH, goal_differences)
 
-    predicted_home_goal_diff = np.average(goal_diffs, weights=weights)
-    return predicted_home_goal_diff
 
+def _weighted_average_goal_diff(
+    home_team: Team, away_team: Team, season_id: int, depth: int, goal_differences: list[int]
+) -> float:
+    """Return the weighted average goal difference of all paths of matches of length <= depth, starting with
+    a match where home_team plays at home and ending with a match where away_team plays away from home.
 
-def _find_all_paths(home_team: Team, away_team: Team, season: str, depth: int) -> list[list[Match]]:
-    """Return a list of all paths of matches of length <= depth, starting with a match
-    where home_team plays at home and ending with a match where away_team plays away from home.
+    The goal difference of a path is the sum of the goal differences of its matches, each taken from the
+    perspective of the team that entered the path first in that match. Each path is weighted by 1 / its length.
 
     Preconditions:
         - league.team_in_league(home_team.name)
         - league.team_in_league(away_team.name)
-        - home_team.name in league.get_team_names(season)
-        - away_team.name in league.get_team_names(season)
-        - season is in the format '20XX-XX' between 2009-10 and 2018-19
+        - season_id is the id of a season in both home_team.seasons and away_team.seasons
+        - goal_differences[match.id] is the home team's goal difference in match, for every match in the league
     """
-    paths: list[list[Match]] = []
-    visited: set[str] = set()  # set of all team names that have been visited
-
-    def dfs(team: Team, path: list[Match], at_home: bool) -> None:
-        """DFS helper for _find_all_paths"""
-        if len(path) > depth:
-            return
-
-        if path and path[-1].away_team == away_team:  # found a complete path
-            paths.append(path.copy())
-            return
-
-        visited.add(team.name)
-
-        for match in team.matches:
-            other_team = match.get_other_team(team)
-            condition1 = match.season != season
-            condition2 = other_team.name in visited
-            condition3 = not at_home and (match.away_team == other_team)
-            condition4 = at_home and (match.home_team == other_team)
-
-            if any({condition1, condition2, condition3, condition4}):
+    # total goal difference and number of complete paths of each length
+    diff_totals = [0] * (depth + 1)
+    path_counts = [0] * (depth + 1)
+    visited = 1 << home_team.id  # bitmask of the ids of all teams that have been visited
+
+    # each frame holds a team on the current path, an iterator over its remaining matches, whether
+    # the team must play at home in the next match of the path and the goal difference of the path so far
+    stack: list[tuple[Team, Iterator[Match], bool, int]] = [
+        (home_team, iter(home_team.matches_by_season[season_id]), True, 0)
+    ]
+    while stack:
+        team, matches, at_home, path_diff = stack[-1]
+        path_length = len(stack)  # length of the path once the next match is added
+        for match in matches:
+            if (match.home_team is team) != at_home:
+                continue
+            other_team = match.away_team if at_home else match.home_team
+            if visited & (1 << other_team.id):
                 continue
-            path.append(match)
-            dfs(other_team, path, not at_home)
-            path.pop()
-
-        visited.remove(team.name)
-
-    dfs(home_team, [], True)
 
-    return paths
+            if at_home:
+                diff = path_diff + goal_differences[match.id]
+            else:
+                diff = path_diff - goal_differences[match.id]
+
+            if match.away_team is away_team:  # found a complete path
+                diff_totals[path_length] += diff
+                path_counts[path_length] += 1
+            elif path_length < depth:  # continue the path from the other team
+                visited |= 1 << other_team.id
+                stack.append((other_team, iter(other_team.matches_by_season[season_id]), not at_home, diff))
+                break
+        else:  # all matches of this team have been explored
+            stack.pop()
+            visited &= ~(1 << team.id)
+
+    weighted_diff = sum(diff_totals[length] / length for length in range(1, depth + 1))
+    total_weight = sum(path_counts[length] / length for length in range(1, depth + 1))
+    return weighted_diff / total_weight
@@ -26,10 +26,10 @@ def most_goals_scored(league: League, season: Optional[str] = None, topx: int =
     for match in matches:
         if season is None or match.season == season:
             if match.result is None:
-                winner_goals = match.details[match.home_team.name].full_time_goals
+                winner_goals = match.details[0].full_time_goals
                 team_name = str(match.home_team.name) + " & " + str(match.away_team.name)
             else:
-                winner_goals = match.details[match.result.name].full_time_goals
+                winner_goals = match.details_for(match.result).full_time_goals
                 team_name = match.result.name
 
             if season is None:
@@ -57,13 +57,13 @@ def most_fairplay(league: League, season: Optional[str] = None, topx: int = 4) -
             home_team = match.home_team.name
             away_team = match.away_team.name
 
-            yellows_h = match.details[home_team].yellow_cards
-            reds_h = match.details[home_team].red_cards * 2
-            fouls_h = match.details[home_team].fouls
+            yellows_h = match.details[0].yellow_cards
+            reds_h = match.details[0].red_cards * 2
+            fouls_h = match.details[0].fouls
 
-            yellows_a = match.details[away_team].yellow_cards
-            reds_a = match.details[away_team].red_cards * 2
-            fouls_a = match.details[away_team].fouls
+            yellows_a = match.details[1].yellow_cards
+            reds_a = match.details[1].red_cards * 2
+            fouls_a = match.details[1].fouls
 
             if home_team not in team_offenses:
                 team_offenses[home_team] = [(yellows_h + reds_h + fouls_h), 1]
@@ -162,11 +162,11 @@ def best_comebacks(league: League, season: Optional[str] = None, topx: int = 4)
             ht_name, at_name = match.home_team.name, match.away_team.name
 
             half_time, full_time = {
-                ht_name: match.details[ht_name].half_time_goals,
-                at_name: match.details[at_name].half_time_goals,
+                ht_name: match.details[0].half_time_goals,
+                at_name: match.details[1].half_time_goals,
             }, {
-                ht_name: match.details[ht_name].full_time_goals,
-                at_name: match.details[at_name].full_time_goals,
+                ht_name: match.details[0].full_time_goals,
+                at_name: match.details[1].full_time_goals,
             }
 
             if half_time[at_name] == half_time[ht_name]:
@@ -255,10 +255,9 @@ def highest_win_rate(league: League, season: Optional[str] = None, topx: int = 4
         - season is in the format '20XX-XX' between 2009-10 and 2018-19 or season is None
         - topx > 0
     """
-    names = league.get_team_names()
+    names = league.get_team_names(season)
     win_rates = []
     for name in names:
-        if season is None or season in league.get_team(name).seasons:
-            win_rates.append((name, round(overall_winrate(league, name, season), 2)))
+        win_rates.append((name, round(overall_winrate(league, name, season), 2)))
 
     return sorted(win_rates, key=lambda win_rate: win_rate[1], reverse=True)[:topx]